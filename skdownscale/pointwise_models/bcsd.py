@@ -1,14 +1,355 @@
 import collections
+import functools
 
 import numpy as np
 import pandas as pd
+from joblib import Parallel, delayed
 from sklearn.utils.validation import check_is_fitted
 
 from .base import TimeSynchronousDownscaler
 from .groupers import DAY_GROUPER, MONTH_GROUPER, PaddedDOYGrouper
-from .quantile import QuantileMapper
+from .quantile import CDF_ALPHA, CDF_BETA, QuantileMapper, plotting_positions
 from .utils import default_none_kwargs, ensure_samples_features
 
+try:
+    import bottleneck as bn
+except ImportError:
+    bn = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+QuantileTables = collections.namedtuple(
+    'QuantileTables', ['keys', 'sizes', 'pp', 'vals', 'lower', 'upper', 'kwargs']
+)
+
+
+def _group_indices(codes):
+    """Integer positions of each group in an array of group labels, like ``GroupBy.indices``"""
+    codes = np.asarray(codes)
+    if not len(codes):
+        return {}
+    if codes.dtype.kind in 'iu' and codes.min() >= 0 and codes.max() <= np.iinfo(np.uint16).max:
+        # months and days of year fit in 16 bits, which numpy sorts with an O(n) radix sort
+        codes = codes.astype(np.uint16)
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    starts = np.flatnonzero(sorted_codes[1:] != sorted_codes[:-1]) + 1
+    uniques = sorted_codes[np.concatenate(([0], starts))]
+    # tolist would turn datetime64 keys (e.g. from a pd.Grouper) into integers
+    keys = list(uniques) if uniques.dtype.kind == 'M' else uniques.tolist()
+    return dict(zip(keys, np.split(order, starts)))
+
+
+def _centered_rolling_mean(a, window):
+    """Centered rolling mean (with ``min_periods=1``) along the first axis of ``a``
+
+    Uses bottleneck's moving window mean when it is installed. Otherwise every window sum is the
+    difference of two entries of the cumulative sum of ``a``, so the whole array is averaged in a
+    single pass regardless of the window size.
+
+    Parameters
+    ----------
+    a : ndarray, shape (n_samples, ...)
+        Values to average.
+    window : int
+        Size of the moving window.
+
+    Returns
+    -------
+    out : ndarray, shape (n_samples, ...)
+    """
+    if bn is not None:
+        # a trailing window over a NaN padded copy is a centered window over ``a``, the padding is
+        # skipped thanks to min_count=1. The copy is float64 since bottleneck accumulates its running
+        # sum in the input dtype
+        after = window - 1 - window // 2
+        padded = np.concatenate([a, np.full((after,) + a.shape[1:], np.nan)])
+        return bn.move_mean(padded, window, min_count=1, axis=0)[after:].astype(a.dtype, copy=False)
+
+    n = a.shape[0]
+    csum = np.zeros((n + 1,) + a.shape[1:])
+    np.cumsum(a, axis=0, dtype=np.float64, out=csum[1:])
+    pos = np.arange(n)
+    left = np.maximum(pos - window // 2, 0)
+    right = np.minimum(pos + window - window // 2, n)
+    counts = (right - left).reshape((-1,) + (1,) * (a.ndim - 1))
+    return ((csum[right] - csum[left]) / counts).astype(a.dtype, copy=False)
+
+
+def _centered_rolling_mean_by_group(values, codes, window):
+    """Centered rolling mean (with ``min_periods=1``) computed independently within each group
+
+    Parameters
+    ----------
+    values : ndarray, shape (n_samples, )
+        Values to average.
+    codes : ndarray of int, shape (n_samples, )
+        Group label of each sample. Samples of a group are averaged in their original order.
+    window : int
+        Size of the moving window.
+
+    Returns
+    -------
+    out : ndarray, shape (n_samples, )
+        Rolling mean of each sample's group, aligned with ``values``.
+    """
+    n = values.shape[0]
+    out = np.empty_like(values)
+    order = np.argsort(codes, kind='mergesort')
+    before = window // 2
+    after = window - 1 - before
+
+    start = 0
+    while start < n:
+        # find the end of the current group
+        stop = start + 1
+        while stop < n and codes[order[stop]] == codes[order[start]]:
+            stop += 1
+
+        # slide a running sum over the group, lo/hi bound the (half-open) window
+        lo = start
+        hi = start
+        total = 0.0
+        for j in range(start, stop):
+            new_hi = min(j + after + 1, stop)
+            while hi < new_hi:
+                total += values[order[hi]]
+                hi += 1
+            new_lo = max(j - before, start)
+            while lo < new_lo:
+                total -= values[order[lo]]
+                lo += 1
+            out[order[j]] = total / (hi - lo)
+        start = stop
+    return out
+
+
+if numba is not None:
+    _centered_rolling_mean_by_group = numba.njit(cache=True)(_centered_rolling_mean_by_group)
+
+
+def _linear_fit(x, y):
+    """Least squares (slope, intercept) of ``y`` against ``x``, with a slope of 0 for a single point"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    x_anom = x - x.mean()
+    denom = (x_anom**2).sum()
+    slope = (x_anom * (y - y.mean())).sum() / denom if denom > 0 else 0.0
+    return slope, y.mean() - slope * x.mean()
+
+
+def _stack_quantile_mappers(mappers):
+    """Stack the fitted CDFs of QuantileMappers into padded 2d arrays
+
+    Parameters
+    ----------
+    mappers : dict
+        Fitted QuantileMapper objects (without detrending), keyed by group.
+
+    Returns
+    -------
+    tables : QuantileTables
+        Row ``i`` of ``pp`` and ``vals`` holds the ``sizes[i]`` plotting positions and values of the
+        CDF of group ``keys[i]`` (padded with NaNs). ``lower`` and ``upper`` hold the (slope,
+        intercept) used to extrapolate past either end of each CDF and ``kwargs`` the extrapolation
+        mode shared by all groups.
+    """
+    keys = sorted(mappers)
+    cdfs = [mappers[key].x_cdf_fit_ for key in keys]
+    sizes = np.array([len(cdf.cdf_.vals) for cdf in cdfs])
+
+    pp = np.full((len(keys), sizes.max()), np.nan)
+    vals = np.full(pp.shape, np.nan, dtype=np.result_type(*[cdf.cdf_.vals for cdf in cdfs]))
+    lower = np.empty((len(keys), 2))
+    upper = np.empty((len(keys), 2))
+    for i, cdf in enumerate(cdfs):
+        pp[i, : sizes[i]] = cdf.cdf_.pp
+        vals[i, : sizes[i]] = cdf.cdf_.vals
+        lower[i] = _linear_fit(cdf.cdf_.pp[: cdf.n_endpoints], cdf.cdf_.vals[: cdf.n_endpoints])
+        upper[i] = _linear_fit(cdf.cdf_.pp[-cdf.n_endpoints :], cdf.cdf_.vals[-cdf.n_endpoints :])
+
+    kwargs = {'extrapolate': cdfs[0].extrapolate}
+    return QuantileTables(np.array(keys), sizes, pp, vals, lower, upper, kwargs)
+
+
+def _quantile_map(X, pp, vals, lower, upper, extrapolate='both'):
+    """Quantile map ``X`` onto the CDF (``pp``, ``vals``)
+
+    Equivalent to ``QuantileMapper.transform`` (without detrending) for one group of stacked
+    QuantileTables.
+
+    Parameters
+    ----------
+    X : ndarray, shape (n_samples, 1)
+        Samples.
+    pp, vals : ndarray, shape (n_quantiles, )
+        Plotting positions and values of the CDF to map onto.
+    lower, upper : tuple of float
+        Slope and intercept used to extrapolate below/above the CDF.
+    extrapolate : str
+        Which tails of the CDF to extrapolate.
+
+    Returns
+    -------
+    y : ndarray, shape (n_samples, 1)
+        Quantile mapped samples.
+    """
+    x = X[:, 0]
+    # plotting positions of X within its own CDF, built like the fitted CDFs by CunnaneTransformer
+    x_pp = np.interp(x, np.sort(x), plotting_positions(len(x), alpha=CDF_ALPHA, beta=CDF_BETA))
+
+    left = -np.inf if extrapolate in ['min', 'both'] else None
+    right = np.inf if extrapolate in ['max', 'both'] else None
+    mapped = np.interp(x_pp, pp, vals, left=left, right=right)
+
+    lower_inds = mapped == -np.inf
+    mapped[lower_inds] = lower[0] * x_pp[lower_inds] + lower[1]
+    upper_inds = mapped == np.inf
+    mapped[upper_inds] = upper[0] * x_pp[upper_inds] + upper[1]
+
+    return mapped.reshape(-1, 1)
+
+
+def _quantile_map_sorted_group(x, order, out, pp, vals, lower, upper, alpha, beta, extrap):
+    """Quantile map one group of ``x`` (the samples ``x[order]``, sorted by value) into ``out``
+
+    Ties share the plotting position of their last occurrence and the CDF (``pp``, ``vals``) is
+    interpolated like ``np.interp``, matching ``_quantile_map`` exactly.
+    """
+    n = order.shape[0]
+    m = pp.shape[0]
+    denom = n + 1.0 - alpha - beta
+    j = 0
+    i = 0
+    while i < n:
+        # plotting position of the last of a run of tied samples
+        last = i
+        while last + 1 < n and x[order[last + 1]] == x[order[i]]:
+            last += 1
+        x_pp = (last + 1 - alpha) / denom
+
+        if x_pp < pp[0]:
+            value = lower[0] * x_pp + lower[1] if extrap[0] else vals[0]
+        elif x_pp > pp[m - 1]:
+            value = upper[0] * x_pp + upper[1] if extrap[1] else vals[m - 1]
+        else:
+            # plotting positions increase within a group, so the search resumes from j
+            while j < m - 1 and pp[j + 1] <= x_pp:
+                j += 1
+            if j == m - 1 or pp[j] == x_pp:
+                value = vals[j]
+            else:
+                slope = (vals[j + 1] - vals[j]) / (pp[j + 1] - pp[j])
+                value = slope * (x_pp - pp[j]) + vals[j]
+                if np.isnan(value):
+                    value = slope * (x_pp - pp[j + 1]) + vals[j + 1]
+                    if np.isnan(value) and vals[j] == vals[j + 1]:
+                        value = vals[j]
+
+        for k in range(i, last + 1):
+            out[order[k]] = value
+        i = last + 1
+
+
+def _quantile_map_sorted_groups(
+    x, order, starts, rows, pp, vals, sizes, lower, upper, alpha, beta, extrap
+):
+    """Quantile map every group of ``x`` onto its row of stacked QuantileTables in one call
+
+    Equivalent to calling ``_quantile_map`` on each group.
+
+    Parameters
+    ----------
+    x : ndarray of float64, shape (n_samples, )
+        Samples.
+    order : ndarray of int, shape (n_samples, )
+        Positions sorting ``x`` by group and then by value.
+    starts : ndarray of int, shape (n_groups + 1, )
+        Bounds of each group in ``order``.
+    rows : ndarray of int, shape (n_groups, )
+        Row of the stacked tables holding the CDF of each group.
+    pp, vals : ndarray of float64, shape (n_tables, n_quantiles)
+        Padded plotting positions and values of the stacked CDFs.
+    sizes : ndarray of int, shape (n_tables, )
+        Number of quantiles of each CDF.
+    lower, upper : ndarray of float64, shape (n_tables, 2)
+        Slope and intercept used to extrapolate below/above each CDF.
+    alpha, beta : float
+        Plotting positions parameters.
+    extrap : ndarray of bool, shape (2, )
+        Whether to extrapolate below/above the CDFs.
+
+    Returns
+    -------
+    out : ndarray of float64, shape (n_samples, )
+        Quantile mapped samples, aligned with ``x``.
+    """
+    out = np.empty(x.shape[0])
+    for g in range(rows.shape[0]):
+        row = rows[g]
+        m = sizes[row]
+        _quantile_map_sorted_group(
+            x,
+            order[starts[g] : starts[g + 1]],
+            out,
+            pp[row, :m],
+            vals[row, :m],
+            lower[row],
+            upper[row],
+            alpha,
+            beta,
+            extrap,
+        )
+    return out
+
+
+if numba is not None:
+    _quantile_map_sorted_group = numba.njit(cache=True)(_quantile_map_sorted_group)
+    _quantile_map_sorted_groups = numba.njit(cache=True)(_quantile_map_sorted_groups)
+
+
+def _apply_by_group(X, positions, funcs, out, n_jobs=1, pre_shift=None, post_shift=None):
+    """Transform each group of ``X`` with its own function and scatter the results into ``out``
+
+    Parameters
+    ----------
+    X : ndarray, shape (n_samples, n_features)
+        Samples.
+    positions : dict
+        Integer positions of each group in ``X``, keyed by group.
+    funcs : dict
+        Functions mapping the samples of a group to their transformed values, keyed by group.
+    out : ndarray, shape (n_samples, n_features)
+        Output array, filled in place.
+    n_jobs : int, optional
+        Number of jobs to run in parallel. Default is 1.
+    pre_shift, post_shift : ndarray, shape (n_samples, n_features), optional
+        Shifts subtracted from ``X`` before / added to the result after the transform, applied
+        while gathering / scattering each group.
+
+    Returns
+    -------
+    out : ndarray, shape (n_samples, n_features)
+    """
+
+    def gather(idx):
+        if pre_shift is None:
+            return X[idx]
+        return X[idx] - pre_shift[idx]
+
+    mapped = Parallel(n_jobs=n_jobs)(
+        delayed(funcs[key])(gather(idx)) for key, idx in positions.items()
+    )
+    for idx, qmapped in zip(positions.values(), mapped):
+        if post_shift is None:
+            out[idx] = qmapped
+        else:
+            out[idx] = qmapped + post_shift[idx]
+    return out
+
 
 class BcsdBase(TimeSynchronousDownscaler):
     """Base class for BCSD model."""
@@ -23,6 +364,8 @@ class BcsdBase(TimeSynchronousDownscaler):
         climate_trend=MONTH_GROUPER,
         return_anoms=True,
         qm_kwargs=None,
+        n_jobs=1,
+        dtype=np.float32,
     ):
 
         self.time_grouper = time_grouper
@@ -30,6 +373,8 @@ class BcsdBase(TimeSynchronousDownscaler):
         self.climate_trend = climate_trend
         self.return_anoms = return_anoms
         self.qm_kwargs = qm_kwargs
+        self.n_jobs = n_jobs
+        self.dtype = dtype
 
     def _pre_fit(self):
         if isinstance(self.time_grouper, str):
@@ -43,53 +388,190 @@ class BcsdBase(TimeSynchronousDownscaler):
             self.time_grouper_ = self.time_grouper
             self.timestep = 'monthly'
 
-    def _create_groups(self, df, climate_trend=False):
-        """helper function to create groups by either daily or month"""
+    def _group_key(self, index, grouper):
+        """helper function to compute the group labels of the builtin groupers in one vectorized call
+
+        Returns None if ``grouper`` is not one of the builtin groupers.
+        """
+        if grouper is MONTH_GROUPER:
+            return index.month.values
+        elif grouper is DAY_GROUPER:
+            return index.day.values
+        return None
+
+    def _group_codes(self, index, grouper):
+        """helper function to compute the group label of every element of ``index``
+
+        ``grouper`` is either a function of a timestamp or anything ``groupby`` accepts (e.g. a
+        ``pd.Grouper``), in which case each element is labeled with the key of its group.
+        """
+        codes = self._group_key(index, grouper)
+        if codes is not None:
+            return codes
+        if callable(grouper):
+            return np.asarray([grouper(ts) for ts in index])
+
+        indices = pd.Series(np.arange(len(index)), index=index).groupby(grouper).indices
+        keys = pd.Index(list(indices)).values
+        codes = np.empty(len(index), dtype=keys.dtype)
+        for key, idx in zip(keys, indices.values()):
+            codes[idx] = key
+        return codes
+
+    def _keys(self, index, climate_trend=False):
+        """helper function to compute the (non-overlapping) group key of every timestep"""
         if self.timestep == 'monthly':
-            return df.groupby(self.time_grouper)
+            return self._group_codes(index, self.time_grouper_)
         elif self.timestep == 'daily':
             if climate_trend:
-                # group by day only rather than also +/- offset days
-                return df.groupby(self.climate_trend_grouper)
+                return self._group_codes(index, self.climate_trend_grouper)
             else:
-                return self.time_grouper(df)
+                # padded day of year groups are keyed by the day of year itself
+                return index.dayofyear.values
         else:
             raise TypeError('unexpected time grouper type %s' % self.time_grouper)
 
-    def _qm_fit_by_group(self, groups):
+    def _predict_keys(self, index):
+        """helper function to compute the climate trend and climatology keys of every timestep
+
+        For monthly models both are the same array.
+        """
+        trend_codes = self._keys(index, climate_trend=True)
+        if self.timestep == 'monthly':
+            return trend_codes, trend_codes
+        return trend_codes, self._keys(index)
+
+    def _group_positions(self, index, climate_trend=False, padded=False, codes=None):
+        """helper function to find the integer positions of each group in ``index``
+
+        With ``padded=True`` the (possibly overlapping) groups of the time grouper used for fitting
+        are returned, otherwise each timestep belongs to exactly one group (optionally given by
+        precomputed ``codes``).
+        """
+        if padded and self.timestep == 'daily':
+            return self.time_grouper(pd.DataFrame(index=index)).indices
+
+        if codes is None:
+            codes = self._keys(index, climate_trend)
+        return _group_indices(codes)
+
+    def _climatology(self, values, positions, columns=None):
+        """helper function to calculate the mean of each (fitting) group, sorted by group key"""
+        return pd.DataFrame(
+            [values[idx].mean(axis=0) for idx in positions.values()],
+            index=list(positions),
+            columns=columns,
+        )
+
+    def _align_climatology(self, climo_arr, climo_keys, index, climate_trend=False, codes=None):
+        """helper function to broadcast the climatology (values and sorted group keys, as cached
+        at fit time) onto every timestep"""
+        keys = self._keys(index, climate_trend) if codes is None else codes
+        pos = np.searchsorted(climo_keys, keys).clip(max=len(climo_keys) - 1)
+        if not np.array_equal(climo_keys[pos], keys):
+            raise KeyError('climatology is missing groups found in the input data')
+        return climo_arr[pos]
+
+    def _qm_fit_by_group(self, values, positions):
         """helper function to fit quantile mappers by group
 
         Note that we store these mappers for later
         """
-        self.quantile_mappers_ = {}
         qm_kwargs = default_none_kwargs(self.qm_kwargs)
-        for key, group in groups:
-            self.quantile_mappers_[key] = QuantileMapper(**qm_kwargs).fit(group)
+        mappers = Parallel(n_jobs=self.n_jobs)(
+            delayed(QuantileMapper(**qm_kwargs).fit)(values[idx]) for idx in positions.values()
+        )
+        self.quantile_mappers_ = dict(zip(positions, mappers))
+
+        if qm_kwargs.get('detrend', False):
+            # detrending fits a new trend to every group at transform time, keep the mappers
+            self._qm_tables = None
+        else:
+            self._qm_tables = _stack_quantile_mappers(self.quantile_mappers_)
 
-    def _qm_transform_by_group(self, groups):
-        """helper function to apply quantile mapping by group
+    def _qm_funcs(self):
+        """helper function to get the quantile mapping function of each group"""
+        tables = getattr(self, '_qm_tables', None)
+        if tables is None:
+            return {key: mapper.transform for key, mapper in self.quantile_mappers_.items()}
 
-        Note that we recombine the dataframes using pd.concat, there may be a better way to do this
-        """
+        return {
+            key: functools.partial(
+                _quantile_map,
+                pp=tables.pp[i, :n],
+                vals=tables.vals[i, :n],
+                lower=tables.lower[i],
+                upper=tables.upper[i],
+                **tables.kwargs,
+            )
+            for i, (key, n) in enumerate(zip(tables.keys, tables.sizes))
+        }
 
-        dfs = []
-        for key, group in groups:
-            qmapped = self.quantile_mappers_[key].transform(group)
-            dfs.append(pd.DataFrame(qmapped, index=group.index, columns=group.columns))
-        return pd.concat(dfs).sort_index()
+    def _qm_transform_by_group(self, values, index, codes=None, pre_shift=None, post_shift=None):
+        """helper function to apply quantile mapping by group
 
-    def _remove_climatology(self, obj, climatology, climate_trend=False):
-        """helper function to remove climatologies"""
-        dfs = []
-        for key, group in self._create_groups(obj, climate_trend):
-            if self.timestep == 'monthly':
-                dfs.append(group - climatology.loc[key].values)
-            elif self.timestep == 'daily':
-                dfs.append(group - climatology.loc[key])
+        Each group is gathered from ``values`` by its integer positions and the mapped values are
+        scattered back into a single preallocated array, so the result keeps the original ordering
+        of ``values``. Optional ``pre_shift``/``post_shift`` arrays are removed from/added to the
+        data as part of the same pass.
 
-        result = pd.concat(dfs).sort_index()
-        assert obj.shape == result.shape
-        return result
+        When numba is installed and the mappers are stacked, all groups are instead mapped at once
+        by a compiled kernel, avoiding one Python call per group.
+        """
+        values = np.ascontiguousarray(values)
+        tables = getattr(self, '_qm_tables', None)
+        if numba is not None and tables is not None:
+            return self._qm_transform_batched(values, index, tables, codes, pre_shift, post_shift)
+
+        return _apply_by_group(
+            values,
+            self._group_positions(index, climate_trend=True, codes=codes),
+            self._qm_funcs(),
+            np.empty(values.shape, dtype=values.dtype),
+            n_jobs=self.n_jobs,
+            pre_shift=pre_shift,
+            post_shift=post_shift,
+        )
+
+    def _qm_transform_batched(self, values, index, tables, codes, pre_shift, post_shift):
+        """helper function to quantile map all groups with a single call to the compiled kernel"""
+        if codes is None:
+            codes = self._keys(index, climate_trend=True)
+        codes = np.asarray(codes)
+        rows = np.searchsorted(tables.keys, codes).clip(max=len(tables.keys) - 1)
+        if not np.array_equal(tables.keys[rows], codes):
+            raise KeyError('no quantile mapper was fit for some groups found in the input data')
+
+        x = values[:, 0] if pre_shift is None else values[:, 0] - pre_shift[:, 0]
+        x = x.astype(np.float64)
+        order = np.lexsort((x, rows))
+        sorted_rows = rows[order]
+        starts = np.flatnonzero(sorted_rows[1:] != sorted_rows[:-1]) + 1
+        extrapolate = tables.kwargs['extrapolate']
+        mapped = _quantile_map_sorted_groups(
+            x,
+            order,
+            np.concatenate(([0], starts, [len(x)])),
+            sorted_rows[np.concatenate(([0], starts))],
+            tables.pp,
+            tables.vals.astype(np.float64, copy=False),
+            tables.sizes,
+            tables.lower,
+            tables.upper,
+            CDF_ALPHA,
+            CDF_BETA,
+            np.array([extrapolate in ['min', 'both'], extrapolate in ['max', 'both']]),
+        ).reshape(-1, 1)
+
+        out = np.empty(values.shape, dtype=values.dtype)
+        out[:] = mapped if post_shift is None else mapped + post_shift
+        return out
+
+    def _remove_climatology(
+        self, values, climo_arr, climo_keys, index, climate_trend=False, codes=None
+    ):
+        """helper function to remove climatologies"""
+        return values - self._align_climatology(climo_arr, climo_keys, index, climate_trend, codes)
 
 
 class BcsdPrecipitation(BcsdBase):
@@ -102,6 +584,12 @@ class BcsdPrecipitation(BcsdBase):
         time periods. Default is 'M' (e.g. Monthly).
     qm_kwargs : dict
         Keyword arguments to pass to QuantileMapper.
+    n_jobs : int, optional
+        Number of jobs used to fit and apply the QuantileMapper of each time group in parallel.
+        ``-1`` means using all processors. Default is 1.
+    dtype : numpy dtype, optional
+        Floating point precision used for all computations and for the returned values.
+        Default is ``np.float32``.
 
     Attributes
     ----------
@@ -128,20 +616,26 @@ class BcsdPrecipitation(BcsdBase):
 
         self._pre_fit()
         X, y = self._validate_data(X, y, y_numeric=True)
+        X = ensure_samples_features(X).astype(self.dtype, copy=False)
+        y = ensure_samples_features(y).astype(self.dtype, copy=False)
         # TO-DO: set n_features_n attribute
         if self.n_features_in_ != 1:
             raise ValueError(f'BCSD only supports 1 feature, found {self.n_features_in_}')
 
-        y_groups = self._create_groups(y)
+        # group once, the same (padded) groups are used for the climatology and the mappers
+        positions = self._group_positions(y.index, padded=True)
+
         # calculate the climatologies
-        self.y_climo_ = y_groups.mean()
+        self.y_climo_ = self._climatology(y.values, positions, columns=y.columns)
+        self._y_climo_arr = self.y_climo_.values
+        self._y_climo_keys = np.asarray(self.y_climo_.index)
 
         if self.return_anoms and self.y_climo_.values.min() <= 0:
             raise ValueError('Invalid value in target climatology')
 
         # fit the quantile mappers
         # TO-DO: do we need to detrend the data before fitting the quantile mappers??
-        self._qm_fit_by_group(y_groups)
+        self._qm_fit_by_group(y.values, positions)
 
         return self
 
@@ -159,31 +653,29 @@ class BcsdPrecipitation(BcsdBase):
             Returns predicted values.
         """
         check_is_fitted(self)
-        X = self._validate_data(X)
+        X = ensure_samples_features(self._validate_data(X)).astype(self.dtype, copy=False)
+        index = X.index
+        trend_codes, codes = self._predict_keys(index)
 
         # Bias correction
         # apply quantile mapping by month or day
-        Xqm = self._qm_transform_by_group(self._create_groups(X, climate_trend=True))
+        Xqm = self._qm_transform_by_group(X.values, index, codes=trend_codes)
 
         # calculate the anomalies as a ratio of the training data
         if self.return_anoms:
-            return self._calc_ratio_anoms(Xqm, self.y_climo_)
+            result = self._calc_ratio_anoms(
+                Xqm, self._y_climo_arr, self._y_climo_keys, index, codes=codes
+            )
         else:
-            return Xqm
+            result = Xqm
+        assert result.shape == X.shape, 'shape of climo is not equal to input array'
+        return pd.DataFrame(result, index=index, columns=X.columns)
 
-    def _calc_ratio_anoms(self, obj, climatology, climate_trend=False):
+    def _calc_ratio_anoms(
+        self, values, climo_arr, climo_keys, index, climate_trend=False, codes=None
+    ):
         """helper function for dividing day groups by climatology"""
-        dfs = []
-        for key, group in self._create_groups(obj, climate_trend):
-            if self.timestep == 'monthly':
-                dfs.append(group / climatology.loc[key].values)
-            else:
-                dfs.append(group / climatology.loc[key])
-
-        result = pd.concat(dfs).sort_index()
-        assert obj.shape == result.shape
-
-        return result
+        return values / self._align_climatology(climo_arr, climo_keys, index, climate_trend, codes)
 
     def _more_tags(self):
         return {
@@ -228,19 +720,25 @@ class BcsdTemperature(BcsdBase):
 
         self._pre_fit()
         X, y = self._validate_data(X, y, y_numeric=True)
+        X = ensure_samples_features(X).astype(self.dtype, copy=False)
+        y = ensure_samples_features(y).astype(self.dtype, copy=False)
         # TO-DO: set n_features_in attribute
         if self.n_features_in_ != 1:
             raise ValueError(f'BCSD only supports up to 4 features, found {self.n_features_in_}')
 
-        # make groups for day or month
-        y_groups = self._create_groups(y)
+        # group once, the same (padded) groups are used for the climatologies and the mappers
+        positions = self._group_positions(y.index, padded=True)
 
         # calculate the climatologies
-        self._x_climo = self._create_groups(X).mean()
-        self.y_climo_ = y_groups.mean()
+        self._x_climo = self._climatology(X.values, positions, columns=X.columns)
+        self.y_climo_ = self._climatology(y.values, positions, columns=y.columns)
+        self._x_climo_arr = self._x_climo.values
+        self._x_climo_keys = np.asarray(self._x_climo.index)
+        self._y_climo_arr = self.y_climo_.values
+        self._y_climo_keys = np.asarray(self.y_climo_.index)
 
         # fit the quantile mappers
-        self._qm_fit_by_group(y_groups)
+        self._qm_fit_by_group(y.values, positions)
 
         return self
 
@@ -258,46 +756,52 @@ class BcsdTemperature(BcsdBase):
             Returns predicted values.
         """
         check_is_fitted(self)
-        X = self._check_array(X)
+        X = ensure_samples_features(self._check_array(X)).astype(self.dtype, copy=False)
+        X_vals, index = X.values, X.index
+        trend_codes, codes = self._predict_keys(index)
 
         # Calculate the 9-year running mean for each month
-        def rolling_func(x):
-            return x.rolling(9, center=True, min_periods=1).mean()
-
-        X_rolling_mean = X.groupby(self.climate_trend, group_keys=False).apply(rolling_func)
+        X_rolling_mean = self._rolling_mean_by_group(X_vals, index, window=9)
 
         # remove climatology from 9-year monthly mean climate trend
-        X_shift = self._remove_climatology(X_rolling_mean, self._x_climo, climate_trend=True)
-
-        # remove shift from model data
-        X_no_shift = X - X_shift
+        X_shift = self._remove_climatology(
+            X_rolling_mean, self._x_climo_arr, self._x_climo_keys, index, codes=trend_codes
+        )
 
         # Bias correction
-        # apply quantile mapping by month or day
-        Xqm = self._qm_transform_by_group(self._create_groups(X_no_shift, climate_trend=True))
-
-        # restore the climate trend
-        X_qm_with_shift = X_shift + Xqm
+        # remove shift from model data, apply quantile mapping by month or day and restore the
+        # climate trend, one group at a time
+        X_qm_with_shift = self._qm_transform_by_group(
+            X_vals, index, codes=trend_codes, pre_shift=X_shift, post_shift=X_shift
+        )
 
         # return bias corrected absolute values or calculate the anomalies
         if self.return_anoms:
-            return self._remove_climatology(X_qm_with_shift, self.y_climo_)
+            result = self._remove_climatology(
+                X_qm_with_shift, self._y_climo_arr, self._y_climo_keys, index, codes=codes
+            )
         else:
-            return X_qm_with_shift
+            result = X_qm_with_shift
+        assert result.shape == X.shape, 'shape of climo is not equal to input array'
+        return pd.DataFrame(result, index=index, columns=X.columns)
 
-    def _remove_climatology(self, obj, climatology, climate_trend=False):
-        """helper function to remove climatologies"""
-        dfs = []
-        for key, group in self._create_groups(obj, climate_trend):
-            if self.timestep == 'monthly':
-                dfs.append(group - climatology.loc[key].values)
-            elif self.timestep == 'daily':
-                dfs.append(group - climatology.loc[key].values)
-
-        result = pd.concat(dfs).sort_index()
-        if obj.shape != result.shape:
-            raise ValueError('shape of climo is not equal to input array')
-        return result
+    def _rolling_mean_by_group(self, values, index, window=9):
+        """helper function to calculate a centered rolling mean within each climate trend group
+
+        Uses a compiled kernel when numba is installed and a moving mean per group otherwise.
+        """
+        codes = self._group_codes(index, self.climate_trend)
+        out = np.empty_like(values)
+        if numba is None:
+            for idx in _group_indices(codes).values():
+                out[idx] = _centered_rolling_mean(values[idx], window)
+        else:
+            codes, _ = pd.factorize(codes)
+            for i in range(values.shape[1]):
+                out[:, i] = _centered_rolling_mean_by_group(
+                    np.ascontiguousarray(values[:, i]), codes, window
+                )
+        return out
 
     def _more_tags(self):
         return {
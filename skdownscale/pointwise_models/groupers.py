@@ -23,14 +23,18 @@ class PaddedDOYGrouper(SkdownscaleGroupGeneratorBase):
         self.max = 366
         # check for leap days
         # if leap days present, flag for day groups count
-        if len(self.df[((self.df.index.month == 2) & (self.df.index.day == 29))]) > 0:
+        if ((self.df.index.month == 2) & (self.df.index.day == 29)).any():
             self.leap = 'leap'
         else:
             self.leap = 'noleap'
         # split up data by leap and non leap years
         # necessary because pandas dayofyear
-        self.df_leap = self.df[self.df.index.is_leap_year]
-        self.df_noleap = self.df[~self.df.index.is_leap_year]
+        dayofyear = self.df.index.dayofyear.values
+        is_leap_year = np.asarray(self.df.index.is_leap_year)
+        self._leap_positions = np.flatnonzero(is_leap_year)
+        self._noleap_positions = np.flatnonzero(~is_leap_year)
+        self._dayofyear_leap = dayofyear[self._leap_positions]
+        self._dayofyear_noleap = dayofyear[self._noleap_positions]
         self.offset = offset
         self.days_of_nonleap_year = np.arange(self.n, self.max)
         self.days_of_leap_year = np.arange(self.n, self.max + 1)
@@ -43,47 +47,70 @@ class PaddedDOYGrouper(SkdownscaleGroupGeneratorBase):
         self.n = 1
         return self
 
-    def __next__(self):
-        # n as day of year
-        if self.n > self.max:
-            raise StopIteration
-
-        i = self.n - 1
+    def _padded_days(self, n):
+        """days of year in the group of day ``n`` (for leap and non leap years)"""
+        i = n - 1
         total_days = (2 * self.offset) + 1
 
         # create day groups with +/- offset # of days
         first_set_leap = self.days_of_leap_year_wrapped[i : i + self.offset]
         first_set_noleap = self.days_of_nonleap_year_wrapped[i : i + self.offset]
 
-        sec_set_leap = self.days_of_leap_year_wrapped[self.n + self.offset : i + total_days]
-        sec_set_noleap = self.days_of_nonleap_year_wrapped[self.n + self.offset : i + total_days]
+        sec_set_leap = self.days_of_leap_year_wrapped[n + self.offset : i + total_days]
+        sec_set_noleap = self.days_of_nonleap_year_wrapped[n + self.offset : i + total_days]
 
-        all_days_leap = np.concatenate((first_set_leap, np.array([self.n]), sec_set_leap), axis=0)
-        all_days_noleap = np.concatenate(
-            (first_set_noleap, np.array([self.n]), sec_set_noleap), axis=0
-        )
+        all_days_leap = np.concatenate((first_set_leap, np.array([n]), sec_set_leap), axis=0)
+        all_days_noleap = np.concatenate((first_set_noleap, np.array([n]), sec_set_noleap), axis=0)
 
         # check that day groups contain the correct number of days
         if len(set(all_days_leap)) != total_days and self.leap == 'noleap':
             warnings.warn('leap days not included, day groups in leap years missing leap days')
 
-        if len(set(all_days_noleap)) != total_days and self.n != 366:
+        if len(set(all_days_noleap)) != total_days and n != 366:
             raise ValueError('no leap day groups do not contain the correct set of days')
 
-        result = pd.concat(
+        return all_days_leap, all_days_noleap
+
+    def _group_positions(self, n):
+        """integer positions of the rows of ``df`` in the group of day ``n``
+
+        Rows from leap years come first, followed by the rows from non leap years (each in time
+        order). Detrending fits a trend against the row order, so this order matters.
+        """
+        all_days_leap, all_days_noleap = self._padded_days(n)
+        # lookup tables of the days in the group, indexed by day of year
+        in_group_leap = np.zeros(self.max + 1, dtype=bool)
+        in_group_leap[all_days_leap] = True
+        in_group_noleap = np.zeros(self.max + 1, dtype=bool)
+        in_group_noleap[all_days_noleap] = True
+        return np.concatenate(
             [
-                self.df_leap[self.df_leap.index.dayofyear.isin(all_days_leap)],
-                self.df_noleap[self.df_noleap.index.dayofyear.isin(all_days_noleap)],
+                self._leap_positions[in_group_leap[self._dayofyear_leap]],
+                self._noleap_positions[in_group_noleap[self._dayofyear_noleap]],
             ]
         )
 
+    def __next__(self):
+        # n as day of year
+        if self.n > self.max:
+            raise StopIteration
+
+        result = self.df.iloc[self._group_positions(self.n)]
+
         self.n += 1
 
         return self.n - 1, result
 
+    @property
+    def indices(self):
+        """dict of {day of year: integer positions of the group in ``df``}"""
+        return {n: self._group_positions(n) for n in range(1, self.max + 1)}
+
     def mean(self):
+        # gather each group by its integer positions rather than slicing a DataFrame per group
+        vals = self.df.values[:, 0]
         arr_means = np.full((self.max, 1), np.inf)
-        for key, group in self:
-            arr_means[key - 1] = group.mean().values[0]
+        for key, idx in self.indices.items():
+            arr_means[key - 1] = np.nanmean(vals[idx])
         result = pd.DataFrame(arr_means, index=self.days_of_leap_year)
         return result
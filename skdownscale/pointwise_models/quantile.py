@@ -13,6 +13,11 @@ from .utils import check_max_features, default_none_kwargs
 SYNTHETIC_MIN = -1e20
 SYNTHETIC_MAX = 1e20
 
+# plotting positions parameters of the CDFs built by CunnaneTransformer.fit, which does not use the
+# transformer's own alpha/beta
+CDF_ALPHA = 0.4
+CDF_BETA = 0.4
+
 Cdf = collections.namedtuple('CDF', ['pp', 'vals'])
 
 
@@ -473,7 +478,7 @@ class CunnaneTransformer(TransformerMixin, BaseEstimator):
             raise ValueError('CunnaneTransformer.fit() only supports a single feature')
         X = X[:, 0]
 
-        self.cdf_ = Cdf(plotting_positions(len(X)), np.sort(X))
+        self.cdf_ = Cdf(plotting_positions(len(X), alpha=CDF_ALPHA, beta=CDF_BETA), np.sort(X))
         return self
 
     def transform(self, X):
@@ -5,6 +5,8 @@ import xarray as xr
 from sklearn.utils.estimator_checks import parametrize_with_checks
 
 from skdownscale.pointwise_models import (
+    DAY_GROUPER,
+    MONTH_GROUPER,
     AnalogRegression,
     BcsdPrecipitation,
     BcsdTemperature,
@@ -314,6 +316,70 @@ def test_paddeddoygrouper():
     )
 
 
+def test_paddeddoygrouper_indices():
+    index = pd.date_range(start='1980-01-01', end='1982-12-31')
+    X = pd.DataFrame({'foo': np.random.random(len(index))}, index=index)
+    day_groups = PaddedDOYGrouper(X)
+    indices = day_groups.indices
+
+    assert list(indices) == list(range(1, 367))
+    for key, group in day_groups:
+        np.testing.assert_array_equal(X.index[indices[key]], group.index)
+
+    # leap year rows first, then non leap year rows
+    X = pd.DataFrame(index=pd.date_range(start='1979-12-01', end='1982-12-31'))
+    years = X.index[PaddedDOYGrouper(X).indices[1]].year
+    np.testing.assert_array_equal(years, [1980] * 31 + [1979] * 15 + [1981] * 31 + [1982] * 31)
+
+
+def test_paddeddoygrouper_mean():
+    index = pd.date_range(start='1980-01-01', end='1982-12-31')
+    X = pd.DataFrame({'foo': np.random.random(len(index))}, index=index)
+    day_groups = PaddedDOYGrouper(X)
+
+    expected = [group['foo'].mean() for _, group in PaddedDOYGrouper(X)]
+    actual = day_groups.mean()
+    assert actual.shape == (366, 1)
+    np.testing.assert_allclose(actual.values[:, 0], expected)
+
+
+def test_bcsd_nasanex_detrend():
+    # detrending fits a trend against the row order of each padded day of year group, which has
+    # the leap year rows first
+    index = pd.date_range(start='1979-01-01', end='1982-12-31')
+    trend = np.linspace(0, 1, len(index))
+    X = pd.DataFrame({'foo': np.random.random(len(index)) + trend}, index=index)
+    y = pd.DataFrame({'foo': np.random.random(len(index)) + 2 * trend}, index=index)
+
+    def padded_group(df, n, offset=15):
+        parts = []
+        for is_leap, days_in_year in [(True, 366), (False, 365)]:
+            days = (np.arange(n - offset, n + offset + 1) - 1) % days_in_year + 1
+            parts.append(df[(df.index.is_leap_year == is_leap) & df.index.dayofyear.isin(days)])
+        return pd.concat(parts)
+
+    model = BcsdPrecipitation(
+        time_grouper='daily_nasa-nex',
+        qm_kwargs={'detrend': True},
+        return_anoms=False,
+        dtype=np.float64,
+    )
+    y_hat = model.fit(X, y).predict(X)
+
+    # predict maps the timesteps of each day of month with the mapper of that day of year
+    expected = pd.concat(
+        [
+            pd.DataFrame(
+                QuantileMapper(detrend=True).fit(padded_group(y, day)).transform(group),
+                index=group.index,
+                columns=group.columns,
+            )
+            for day, group in X.groupby(X.index.day)
+        ]
+    ).sort_index()
+    np.testing.assert_allclose(y_hat.values, expected.values)
+
+
 def test_BcsdTemperature_nasanex():
     index = pd.date_range(start='1980-01-01', end='1982-12-31')
     X = pd.DataFrame({'foo': np.random.random(len(index))}, index=index)
@@ -344,3 +410,234 @@ def test_EquidistantCdfMatcher():
             assert (y_test.reshape(-1, 1) == (y_train.values + projected_change)).all()
         elif kind == 'ratio':
             assert (y_test.reshape(-1, 1) == (y_train.values * projected_change)).all()
+
+
+@pytest.mark.parametrize('model_cls', [BcsdTemperature, BcsdPrecipitation])
+def test_bcsd_predict_preserves_index(model_cls):
+    # start mid-year so that the month groups are not in calendar order
+    index = pd.date_range('1980-07-01', periods=120, freq='MS')
+    X = pd.DataFrame({'foo': np.random.random(len(index)) + 1}, index=index)
+    y = X + 2
+
+    y_hat = model_cls(return_anoms=False).fit(X, y).predict(X)
+    assert isinstance(y_hat, pd.DataFrame)
+    assert y_hat.index.equals(X.index)
+    assert y_hat.shape == X.shape
+
+
+@pytest.mark.parametrize('model_cls', [BcsdTemperature, BcsdPrecipitation])
+def test_bcsd_series_target(model_cls):
+    index = pd.date_range('1980-01-01', periods=120, freq='MS')
+    X = pd.DataFrame({'foo': np.random.random(len(index)) + 1}, index=index)
+
+    y_hat = model_cls().fit(X, X['foo'] + 2).predict(X)
+    assert y_hat.shape == X.shape
+
+
+@pytest.mark.parametrize('model_cls', [BcsdTemperature, BcsdPrecipitation])
+def test_bcsd_pd_grouper(model_cls):
+    index = pd.date_range('1980-01-01', periods=400)
+    X = pd.DataFrame({'foo': np.random.random(len(index)) + 1}, index=index)
+    y = X + 2
+    grouper = pd.Grouper(freq='M')
+
+    model = model_cls(time_grouper=grouper, return_anoms=False, dtype=np.float64).fit(X, y)
+    y_hat = model.predict(X)
+    assert y_hat.shape == X.shape
+
+    if model_cls is BcsdPrecipitation:
+        expected = pd.concat(
+            [
+                pd.DataFrame(QuantileMapper().fit(y.loc[g.index]).transform(g), index=g.index)
+                for _, g in X.groupby(grouper)
+            ]
+        )
+        np.testing.assert_allclose(y_hat.values, expected.values)
+
+
+@pytest.mark.parametrize('grouper', [MONTH_GROUPER, DAY_GROUPER])
+def test_bcsd_group_key(grouper):
+    index = pd.date_range('1980-01-01', periods=400)
+    expected = np.array([grouper(ts) for ts in index])
+    np.testing.assert_array_equal(BcsdTemperature()._group_key(index, grouper), expected)
+    assert BcsdTemperature()._group_key(index, lambda x: x.dayofyear) is None
+
+
+@pytest.mark.parametrize('window', [1, 4, 9])
+def test_centered_rolling_mean_by_group(window):
+    from skdownscale.pointwise_models.bcsd import _centered_rolling_mean_by_group
+
+    n = 200
+    values = np.random.random(n)
+    codes = np.random.randint(0, 5, size=n)
+
+    expected = (
+        pd.Series(values)
+        .groupby(codes)
+        .transform(lambda x: x.rolling(window, center=True, min_periods=1).mean())
+    )
+    actual = _centered_rolling_mean_by_group(values, codes, window)
+    np.testing.assert_allclose(actual, expected.values)
+
+
+@pytest.mark.parametrize('use_bottleneck', [True, False])
+@pytest.mark.parametrize('window', [1, 4, 9])
+def test_centered_rolling_mean(window, use_bottleneck, monkeypatch):
+    from skdownscale.pointwise_models import bcsd
+    from skdownscale.pointwise_models.bcsd import _centered_rolling_mean
+
+    if use_bottleneck:
+        pytest.importorskip('bottleneck')
+    else:
+        monkeypatch.setattr(bcsd, 'bn', None)
+
+    values = np.random.random((50, 2))
+    expected = pd.DataFrame(values).rolling(window, center=True, min_periods=1).mean()
+    np.testing.assert_allclose(_centered_rolling_mean(values, window), expected.values)
+
+    # float32 temperatures, long enough for a float32 running sum to drift
+    values = (280 + np.random.random((5000, 1))).astype(np.float32)
+    expected = pd.DataFrame(values.astype(np.float64)).rolling(window, center=True, min_periods=1)
+    actual = _centered_rolling_mean(values, window)
+    assert actual.dtype == np.float32
+    np.testing.assert_allclose(actual, expected.mean().values, rtol=0, atol=1e-4)
+
+
+@pytest.mark.parametrize('time_grouper', [MONTH_GROUPER, 'daily_nasa-nex'])
+def test_bcsd_temperature_without_numba(time_grouper, monkeypatch):
+    from skdownscale.pointwise_models import bcsd
+
+    pytest.importorskip('numba')
+    pytest.importorskip('bottleneck')
+
+    index = pd.date_range('1979-01-01', '1984-12-31')
+    X = pd.DataFrame({'foo': 280 + 10 * np.random.random(len(index))}, index=index)
+    y = X + np.random.random(X.shape)
+    model = BcsdTemperature(time_grouper=time_grouper).fit(X, y)
+    expected = model.predict(X)
+
+    # the rolling means fall back to bottleneck and the quantile mapping to numpy
+    monkeypatch.setattr(bcsd, 'numba', None)
+    actual = model.predict(X)
+    assert (actual.dtypes == np.float32).all()
+    np.testing.assert_allclose(actual.values, expected.values, rtol=0, atol=1e-4)
+
+
+@pytest.mark.parametrize('model_cls', [BcsdTemperature, BcsdPrecipitation])
+def test_bcsd_nasanex_anoms(model_cls):
+    index = pd.date_range(start='1980-01-01', end='1982-12-31')
+    X = pd.DataFrame({'foo': np.random.random(len(index)) + 1}, index=index)
+    y = pd.DataFrame({'foo': np.random.random(len(index)) + 1}, index=index)
+    model = model_cls(time_grouper='daily_nasa-nex').fit(X, y)
+    y_hat = model.predict(X)
+    assert y_hat.shape == X.shape
+    assert y_hat.index.equals(X.index)
+    assert np.isfinite(y_hat.values).all()
+
+
+@pytest.mark.parametrize('model_cls', [BcsdTemperature, BcsdPrecipitation])
+def test_bcsd_n_jobs(model_cls):
+    index = pd.date_range('1980-01-01', periods=240, freq='MS')
+    X = pd.DataFrame({'foo': np.random.random(len(index)) + 1}, index=index)
+    y = X + 2
+
+    expected = model_cls(n_jobs=1).fit(X, y).predict(X)
+    actual = model_cls(n_jobs=2).fit(X, y).predict(X)
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+@pytest.mark.parametrize('model_cls', [BcsdTemperature, BcsdPrecipitation])
+def test_bcsd_predict_unseen_group(model_cls):
+    index = pd.date_range('1980-01-01', periods=120, freq='MS')
+    X = pd.DataFrame({'foo': np.random.random(len(index)) + 1}, index=index)
+    y = X + 2
+
+    first_half = X.index.month <= 6
+    model = model_cls().fit(X[first_half], y[first_half])
+    with pytest.raises(KeyError):
+        model.predict(X)
+
+
+@pytest.mark.parametrize('model_cls', [BcsdTemperature, BcsdPrecipitation])
+def test_bcsd_dtype(model_cls):
+    index = pd.date_range('1980-01-01', periods=240, freq='MS')
+    X = pd.DataFrame({'foo': np.random.random(len(index)) + 1}, index=index)
+    y = X + 2
+
+    y_hat_32 = model_cls().fit(X, y).predict(X)
+    y_hat_64 = model_cls(dtype=np.float64).fit(X, y).predict(X)
+    assert (y_hat_32.dtypes == np.float32).all()
+    assert (y_hat_64.dtypes == np.float64).all()
+    np.testing.assert_allclose(y_hat_32.values, y_hat_64.values, atol=1e-5)
+
+
+@pytest.mark.parametrize(
+    'codes',
+    [
+        np.random.randint(1, 13, size=100),
+        np.random.randint(-5, 5, size=100),
+        np.random.choice(['a', 'b', 'c'], size=100),
+        np.array([], dtype=int),
+    ],
+)
+def test_group_indices(codes):
+    from skdownscale.pointwise_models.bcsd import _group_indices
+
+    expected = pd.Series(codes, dtype=object).groupby(codes).indices
+    actual = _group_indices(codes)
+    assert list(actual) == sorted(expected)
+    for key, idx in expected.items():
+        np.testing.assert_array_equal(actual[key], idx)
+
+
+@pytest.mark.parametrize('extrapolate', [None, 'min', 'max', 'both'])
+@pytest.mark.parametrize('alpha, beta', [(0.4, 0.4), (0, 0), (0.3, 0.5)])
+def test_quantile_map_matches_quantile_mapper(extrapolate, alpha, beta):
+    from skdownscale.pointwise_models.bcsd import _quantile_map, _stack_quantile_mappers
+
+    qt_kwargs = {'extrapolate': extrapolate, 'n_endpoints': 5, 'alpha': alpha, 'beta': beta}
+    mappers = {
+        1: QuantileMapper(qt_kwargs=qt_kwargs).fit(np.random.random((20, 1))),
+        2: QuantileMapper(qt_kwargs=qt_kwargs).fit(np.random.random((30, 1))),
+    }
+    tables = _stack_quantile_mappers(mappers)
+
+    # more samples than were fit, so that the tails of the cdfs are extrapolated
+    X = np.random.random((50, 1)) * 2
+    for i, key in enumerate(tables.keys):
+        n = tables.sizes[i]
+        actual = _quantile_map(
+            X,
+            tables.pp[i, :n],
+            tables.vals[i, :n],
+            tables.lower[i],
+            tables.upper[i],
+            **tables.kwargs,
+        )
+        np.testing.assert_allclose(actual, mappers[key].transform(X))
+
+
+@pytest.mark.parametrize('extrapolate', [None, 'both'])
+@pytest.mark.parametrize('alpha, beta', [(0.4, 0.4), (0, 0)])
+def test_bcsd_batched_quantile_map(extrapolate, alpha, beta, monkeypatch):
+    from skdownscale.pointwise_models import bcsd
+
+    index = pd.date_range('1980-01-01', periods=2000)
+    # rounded so that some samples are tied within their group
+    X = pd.DataFrame({'foo': np.round(np.random.random(len(index)), 2)}, index=index)
+    qt_kwargs = {'extrapolate': extrapolate, 'alpha': alpha, 'beta': beta}
+    model = BcsdTemperature(
+        time_grouper='daily_nasa-nex', qm_kwargs={'qt_kwargs': qt_kwargs}, dtype=np.float64
+    ).fit(X, X * 2 + 1)
+    shift = np.random.random(X.shape)
+
+    actual = model._qm_transform_by_group(X.values, index, pre_shift=shift, post_shift=shift)
+    monkeypatch.setattr(bcsd, 'numba', None)
+    np.testing.assert_array_equal(
+        actual, model._qm_transform_by_group(X.values, index, pre_shift=shift, post_shift=shift)
+    )
+
+    # without the stacked tables every group is mapped by its QuantileMapper
+    model._qm_tables = None
+    expected = model._qm_transform_by_group(X.values, index, pre_shift=shift, post_shift=shift)
+    np.testing.assert_allclose(actual, expected)